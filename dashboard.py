@@ -12,6 +12,11 @@ from reportlab.lib import colors
 from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
+from particoes import carregar_particoes, chave_particao, ler_manifesto, migrar_blocos, salvar_particoes
+from ingestao import ler_em_blocos, ler_vendas, normaliza_placa, padronizar_vendas
+from filiais import consolidar, ler_filiais, salvar_filiais
+from mensalidades import mensalidades_pendentes, projetar_mensalidades
+from duplicados import MAX_BLOCO, chave_cliente, detectar_duplicados
 
 
 # ---------------------------
@@ -65,10 +70,6 @@ def format_brl(valor):
     except:
         return "R$ 0,00"
 
-def normaliza_placa(placa):
-    """Remove caracteres especiais da placa."""
-    return re.sub(r'[^A-Z0-9]', '', str(placa).upper())
-
 def placa_valida(placa):
     """Valida formato de placa brasileira (padrão antigo e Mercosul)."""
     p = normaliza_placa(placa)
@@ -109,36 +110,43 @@ COLUNAS = ['Data','Nome do Cliente','Telefone','Veiculo','Modelo do Veículo','P
 # ---------------------------
 # FUNÇÃO PARA CARREGAR/CRIAR CSV E ADICIONAR CLIENTES FICTICIOS
 # ---------------------------
+def preparar_dados(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante as colunas padrão e converte os tipos das vendas carregadas."""
+    return padronizar_vendas(df, COLUNAS)
+
 def carregar_dados():
+    # Partições mensais (vendas/AAAA-MM.csv) são o armazenamento principal
+    if ler_manifesto(VENDAS_DIR) is not None:
+        return preparar_dados(carregar_particoes(VENDAS_DIR, colunas=COLUNAS))
+
     # Try to load from user's Documents folder first (where saves go)
     arquivo_usuario = DATA_DIR / "vendas.csv"
     
     if arquivo_usuario.exists():
-        df = pd.read_csv(str(arquivo_usuario), encoding="latin-1")
+        # Migra o arquivo único para partições, lendo em blocos; a sessão
+        # ainda carrega a base inteira (EDITAR e VISÃO GERAL usam tudo).
+        # vendas.csv fica como está
+        migrar_blocos(ler_em_blocos(arquivo_usuario, COLUNAS), VENDAS_DIR)
+        return preparar_dados(carregar_particoes(VENDAS_DIR, colunas=COLUNAS))
+
+    # Fallback: try bundled vendas.csv (initial/template)
+    arquivo_bundle = resource_path("vendas.csv")
+    if os.path.exists(arquivo_bundle):
+        df = ler_vendas(arquivo_bundle, COLUNAS)
     else:
-        # Fallback: try bundled vendas.csv (initial/template)
-        arquivo_bundle = resource_path("vendas.csv")
-        if os.path.exists(arquivo_bundle):
-            df = pd.read_csv(arquivo_bundle, encoding="latin-1")
-        else:
-            df = pd.DataFrame(columns=COLUNAS)
-
-    for col in COLUNAS:
-        if col not in df.columns:
-            df[col] = None
-
-    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-    df['Valor Adesao'] = pd.to_numeric(df['Valor Adesao'], errors='coerce')
-    df['Valor Mensalidade'] = pd.to_numeric(df['Valor Mensalidade'], errors='coerce')
-    
-    # Garantir que todas as colunas de texto sejam do tipo string (exceto Data)
-    colunas_texto = ['Nome do Cliente', 'Telefone', 'Veiculo', 'Modelo do Veículo', 'Placa', 'Plano', 'Status Adesao', 'Status Mensalidade']
-    for col in colunas_texto:
-        df[col] = df[col].astype(str)
+        df = pd.DataFrame(columns=COLUNAS)
 
     # App inicia sempre vazio - sem dados de teste
 
-    return df[COLUNAS]
+    return preparar_dados(df)
+
+def novos_clientes_no_mes(df: pd.DataFrame) -> int:
+    """Quantidade de vendas do mês atual, lida do manifesto quando disponível."""
+    manifesto = ler_manifesto(VENDAS_DIR)
+    if manifesto is not None:
+        return manifesto["particoes"].get(chave_particao(datetime.now()), {}).get("linhas", 0)
+    agora = datetime.now()
+    return len(df[(df['Data'].dt.month == agora.month) & (df['Data'].dt.year == agora.year)])
 
 
 # ---------------------------
@@ -154,6 +162,7 @@ def get_data_dir():
 
 DATA_DIR = get_data_dir()
 BACKUP_DIR = DATA_DIR / "backups"
+VENDAS_DIR = DATA_DIR / "vendas"
 
 def ensure_backup_dir():
     try:
@@ -172,14 +181,16 @@ def backup_file(path: str):
             pass
 
 def save_vendas(df_to_save: pd.DataFrame):
-    """Faz backup do arquivo vendas.csv (se existir) e salva o DataFrame no CSV.
+    """Salva o DataFrame nas partições mensais, reescrevendo só os meses alterados.
     
-    Saves to user's Documents folder which is always writable.
+    Cada partição sobrescrita passa antes por backup. Saves to user's
+    Documents folder which is always writable.
     """
     ensure_backup_dir()
-    target = DATA_DIR / "vendas.csv"
-    backup_file(str(target))
-    df_to_save.to_csv(str(target), index=False, encoding="latin-1")
+    salvar_particoes(df_to_save, VENDAS_DIR, backup=backup_file)
+    # O relatório de duplicados guarda índices de linha: qualquer gravação
+    # (cadastro, edição, exclusão) pode deslocá-los, então ele é descartado
+    st.session_state.pop("relatorio_duplicados", None)
 
 def gerar_csv(df_filtrado: pd.DataFrame) -> bytes:
     """Gera arquivo CSV do DataFrame filtrado."""
@@ -331,7 +342,7 @@ def criar_card_moderno(titulo, valor, cor_fundo="#1f77b4"):
 # ---------------------------
 # MENU SUPERIOR EM ABAS
 # ---------------------------
-tabs = st.tabs(["VISÃO GERAL", "CADASTRO", "FILTRO", "EDITAR"])
+tabs = st.tabs(["VISÃO GERAL", "CADASTRO", "FILTRO", "EDITAR", "CONSOLIDADO"])
 
 # ---------------------------
 # VISÃO GERAL
@@ -344,17 +355,17 @@ with tabs[0]:
     else:
         total_adesao = df['Valor Adesao'].sum()
         total_mensalidade = df['Valor Mensalidade'].sum()
-        total_clientes = len(df)
+        # Clientes distintos (telefone ou nome normalizado): mesclar duplicados reduz a contagem
+        clientes = chave_cliente(df)
+        total_clientes = clientes.nunique()
         
         # Calcular valor das adesões pagas
         adesoes_pagas = df[df['Status Adesao'] == 'Pago']
         valor_adesoes_pagas = adesoes_pagas['Valor Adesao'].sum()
-        qtd_clientes_adesao_paga = len(adesoes_pagas)
+        qtd_clientes_adesao_paga = clientes[df['Status Adesao'] == 'Pago'].nunique()
+        qtd_clientes_adesao_pendente = clientes[df['Status Adesao'] == 'Pendente'].nunique()
         
-        mes_atual = datetime.now().month
-        ano_atual = datetime.now().year
-        novos_clientes = df[(df['Data'].dt.month == mes_atual) & (df['Data'].dt.year == ano_atual)]
-        qtd_novos_clientes = len(novos_clientes)
+        qtd_novos_clientes = novos_clientes_no_mes(df)
 
         # PRIMEIRA LINHA - Valores monetários
         kpi1, kpi2 = st.columns(2, gap="medium")
@@ -378,13 +389,13 @@ with tabs[0]:
         
         with col1:
             st.metric("Clientes com Adesão Paga", 
-                     len(df[df['Status Adesao'] == 'Pago']),
-                     f"{len(df[df['Status Adesao'] == 'Pago'])/len(df)*100:.1f}%")
+                     qtd_clientes_adesao_paga,
+                     f"{qtd_clientes_adesao_paga/total_clientes*100:.1f}%")
         
         with col2:
             st.metric("Clientes com Adesão Pendente", 
-                     len(df[df['Status Adesao'] == 'Pendente']),
-                     f"{len(df[df['Status Adesao'] == 'Pendente'])/len(df)*100:.1f}%")
+                     qtd_clientes_adesao_pendente,
+                     f"{qtd_clientes_adesao_pendente/total_clientes*100:.1f}%")
         
         # GRÁFICOS
         st.subheader("📈 Análise de Vendas")
@@ -436,7 +447,7 @@ with tabs[0]:
         
         with col_exec1:
             # Taxa de conversão
-            taxa_conversao = (len(df[df['Status Adesao'] == 'Pago']) / len(df) * 100) if len(df) > 0 else 0
+            taxa_conversao = (qtd_clientes_adesao_paga / total_clientes * 100) if total_clientes > 0 else 0
             st.metric("Taxa de Conversão", f"{taxa_conversao:.1f}%", 
                      delta="Meta: 80%", delta_color="normal")
         
@@ -461,6 +472,31 @@ with tabs[0]:
         top_planos['Receita'] = top_planos['Receita'].apply(format_brl)
         st.dataframe(top_planos, use_container_width=True)
 
+        # RECEITA RECORRENTE - Projeção das mensalidades
+        st.subheader("💳 Receita Recorrente (Mensalidades)")
+        st.caption("Projeção apenas para consulta: o valor da mensalidade não gera cobranças automáticas.")
+
+        col_horiz, col_churn = st.columns(2)
+        with col_horiz:
+            horizonte = st.slider("Horizonte da Projeção (meses)", min_value=6, max_value=60, value=36, step=6)
+        with col_churn:
+            churn_pct = st.number_input("Cancelamento Mensal Estimado (%)", min_value=0.0, max_value=100.0,
+                                        value=2.0, step=0.5, format="%.1f")
+
+        projecao = projetar_mensalidades(df, horizonte=horizonte, churn_mensal=churn_pct / 100)
+
+        col_rec1, col_rec2, col_rec3 = st.columns(3)
+        with col_rec1:
+            st.metric("MRR Atual", format_brl(projecao['Receita Projetada'].iloc[0]),
+                     help=f"Descontado o cancelamento estimado: ~{projecao['Contratos Ativos'].iloc[0]:.0f} contrato(s) "
+                          f"ativos de {format_brl(projecao['MRR Contratado'].iloc[0])} contratados.")
+        with col_rec2:
+            st.metric(f"Receita Projetada ({horizonte} meses)", format_brl(projecao['Receita Acumulada'].iloc[-1]))
+        with col_rec3:
+            st.metric("Mensalidades Pendentes", format_brl(mensalidades_pendentes(df)))
+
+        st.line_chart(projecao[['MRR Contratado', 'Receita Projetada']])
+
 # ---------------------------
 # CADASTRO
 # ---------------------------
@@ -659,6 +695,66 @@ with tabs[3]:
         st.warning("⚠️ Você não tem permissão para editar ou excluir vendas. Entre em contato com o administrador.")
         st.stop()
 
+    # REVISÃO DE DUPLICADOS - mesmo cliente com nome, telefone ou placa em formatos diferentes
+    with st.expander("🔎 Revisão de Clientes Duplicados"):
+        st.caption("Compara apenas vendas com telefone, placa ou nome parecidos. Revise cada par antes de mesclar.")
+        if st.button("🔎 Procurar Duplicados"):
+            with st.spinner("Procurando clientes duplicados..."):
+                st.session_state.relatorio_duplicados = detectar_duplicados(st.session_state.df)
+
+        relatorio, chaves_ignoradas = st.session_state.get("relatorio_duplicados", (None, 0))
+        if chaves_ignoradas:
+            st.caption(f"⚠️ {chaves_ignoradas} telefone(s), placa(s) ou nome(s) aparecem em mais de "
+                       f"{MAX_BLOCO} vendas e não foram comparados.")
+        if relatorio is not None:
+            if relatorio.empty:
+                st.success("✅ Nenhum cliente duplicado encontrado.")
+            else:
+                st.caption(f"📊 {relatorio['Grupo'].nunique()} grupo(s), {len(relatorio)} par(es) para revisão")
+                revisao = relatorio.copy()
+                revisao.insert(0, "Selecionar", False)
+                revisao_editada = st.data_editor(
+                    revisao,
+                    width='stretch',
+                    hide_index=True,
+                    column_config={
+                        "Selecionar": st.column_config.CheckboxColumn("Selecionar", help="Marque os pares confirmados como o mesmo cliente"),
+                        "Pontuação": st.column_config.ProgressColumn("Pontuação", min_value=0.0, max_value=1.0, format="%.2f"),
+                    },
+                    disabled=[c for c in revisao.columns if c != "Selecionar"],
+                    key="editor_duplicados"
+                )
+                st.download_button(
+                    label="📄 Baixar Relatório de Duplicados",
+                    data=gerar_csv(relatorio),
+                    file_name=f"duplicados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv"
+                )
+
+                pares_sel = revisao_editada[revisao_editada["Selecionar"] == True]
+                if not pares_sel.empty:
+                    col_mesclar, col_excluir_dup = st.columns(2)
+                    with col_mesclar:
+                        # Mescla: a venda B passa a usar o nome e o telefone do cliente A
+                        if st.button("🔗 Mesclar Selecionados"):
+                            for _, par in pares_sel.iterrows():
+                                if par['Índice B'] in st.session_state.df.index and par['Índice A'] in st.session_state.df.index:
+                                    st.session_state.df.loc[par['Índice B'], ['Nome do Cliente', 'Telefone']] = \
+                                        st.session_state.df.loc[par['Índice A'], ['Nome do Cliente', 'Telefone']].values
+                            save_vendas(st.session_state.df)
+                            st.success(f"✅ {len(pares_sel)} par(es) mesclado(s) com sucesso!")
+                            st.rerun()
+                    with col_excluir_dup:
+                        # Venda repetida: remove o registro B do par
+                        confirmar_exclusao_dup = st.checkbox("Confirmo que o registro B é uma venda repetida", key="confirmar_exclusao_dup")
+                        if st.button("❌ Excluir Registros B", disabled=not confirmar_exclusao_dup):
+                            idx_b = [i for i in pares_sel['Índice B'].unique() if i in st.session_state.df.index]
+                            st.session_state.df.drop(idx_b, inplace=True)
+                            st.session_state.df.reset_index(drop=True, inplace=True)
+                            save_vendas(st.session_state.df)
+                            st.success(f"✅ {len(idx_b)} registro(s) excluído(s) com sucesso!")
+                            st.rerun()
+
     filtro_nome = st.text_input("Buscar por Nome do Cliente ou Placa", key="filtro_editar")
     df_editavel = st.session_state.df.copy()
 
@@ -756,3 +852,88 @@ with tabs[3]:
                         save_vendas(st.session_state.df)
                         st.success(f"Cliente {novo_nome} atualizado com sucesso!")
                         st.rerun()
+
+# ---------------------------
+# CONSOLIDADO (MULTI-FILIAL)
+# ---------------------------
+with tabs[4]:
+    st.subheader("🏢 Consolidado das Filiais")
+
+    if not tem_permissao("consolidar"):
+        st.warning("⚠️ Você não tem permissão para ver o consolidado das filiais. Entre em contato com o administrador.")
+    else:
+        filiais = ler_filiais(DATA_DIR)
+
+        if tem_permissao("config"):
+            with st.expander("⚙️ Filiais Cadastradas"):
+                nome_filial = st.text_input("Nome da Filial", key="filial_nome")
+                caminho_filial = st.text_input("Diretório de Dados da Filial", help="Pasta que contém vendas.csv ou a pasta vendas/", key="filial_caminho")
+                if st.button("➕ Registrar Filial"):
+                    if not nome_filial.strip():
+                        st.error("❌ Nome da filial é obrigatório.")
+                    # Path("") é o diretório atual: campo vazio não pode passar
+                    elif not caminho_filial.strip() or not Path(caminho_filial.strip()).is_dir():
+                        st.error("❌ Diretório não encontrado.")
+                    elif any(f["nome"] == nome_filial.strip() for f in filiais):
+                        st.error("❌ Já existe uma filial com este nome.")
+                    else:
+                        filiais.append({"nome": nome_filial.strip(), "caminho": str(Path(caminho_filial.strip()).resolve())})
+                        salvar_filiais(DATA_DIR, filiais)
+                        st.success("✅ Filial registrada com sucesso!")
+                        st.rerun()
+
+                if filiais:
+                    st.dataframe(pd.DataFrame(filiais), use_container_width=True, hide_index=True)
+                    remover = st.selectbox("Remover Filial", [f["nome"] for f in filiais], key="filial_remover")
+                    if st.button("❌ Remover Filial"):
+                        salvar_filiais(DATA_DIR, [f for f in filiais if f["nome"] != remover])
+                        st.rerun()
+
+        if not filiais:
+            st.info("Nenhuma filial cadastrada ainda.")
+        else:
+            # Filiais sem alteração desde a última atualização vêm do cache
+            consolidado = consolidar(filiais)
+            grupo = consolidado["grupo"]
+            por_filial = consolidado["por_filial"]
+
+            kpi1, kpi2, kpi3 = st.columns(3, gap="medium")
+            with kpi1:
+                criar_card_moderno("Total de Adesões (Grupo)", format_brl(grupo["valor_adesao"]), "#FF6F61")
+            with kpi2:
+                criar_card_moderno("Valor das Adesões Pagas (Grupo)", format_brl(grupo["valor_adesoes_pagas"]), "#4CAF50")
+            with kpi3:
+                criar_card_moderno("Total de Clientes (Grupo)", f"{int(grupo['vendas'])}", "#2196F3")
+
+            taxa_grupo = (grupo["adesoes_pagas"] / grupo["vendas"] * 100) if grupo["vendas"] > 0 else 0
+            st.metric("Taxa de Conversão do Grupo", f"{taxa_grupo:.1f}%")
+
+            st.markdown("**🏬 Desempenho por Filial**")
+            tabela = pd.DataFrame({
+                "Vendas": por_filial["vendas"].astype(int),
+                "Adesões Pagas": por_filial["adesoes_pagas"].astype(int),
+                "Taxa de Conversão": (por_filial["adesoes_pagas"] / por_filial["vendas"].where(por_filial["vendas"] > 0) * 100)
+                    .fillna(0).map(lambda v: f"{v:.1f}%"),
+                "Receita de Adesões": por_filial["valor_adesao"].apply(format_brl),
+                "Mensalidades": por_filial["valor_mensalidade"].apply(format_brl),
+            })
+            st.dataframe(tabela, use_container_width=True)
+
+            col_graf1, col_graf2 = st.columns(2)
+            with col_graf1:
+                st.markdown("**📊 Vendas por Mês e Filial**")
+                st.line_chart(consolidado["vendas_mes"])
+            with col_graf2:
+                st.markdown("**💰 Receita de Adesões por Mês e Filial**")
+                st.bar_chart(consolidado["receita_mes"])
+
+            filial_sel = st.selectbox("Detalhar Filial", list(por_filial.index), key="filial_detalhe")
+            linha = por_filial.loc[filial_sel]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Vendas", int(linha["vendas"]))
+            with col2:
+                ticket = linha["valor_adesoes_pagas"] / linha["adesoes_pagas"] if linha["adesoes_pagas"] > 0 else 0
+                st.metric("Ticket Médio (Pagas)", format_brl(ticket))
+            with col3:
+                st.metric("Pendências a Receber", format_brl(linha["valor_adesao"] - linha["valor_adesoes_pagas"]))
@@ -0,0 +1,185 @@
+"""Detecção de clientes duplicados por blocagem (telefone, placa e nome)."""
+import difflib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ingestao import normaliza_placa, sem_acento
+from paralelo import pool_de_processos_disponivel
+
+
+STOPWORDS_NOME = {"DA", "DE", "DO", "DAS", "DOS", "E"}
+# Blocos maiores que isso (ex.: nomes muito comuns, telefone de fachada)
+# são pouco específicos e gerariam pares demais; ficam de fora da
+# comparação e são contados no resultado.
+MAX_BLOCO = 50
+TAMANHO_LOTE = 50_000
+LIMIAR = 0.6
+PESOS = {"telefone": 0.35, "placa": 0.30, "nome": 0.35}
+
+
+def normalizar_telefone(telefones: pd.Series) -> pd.Series:
+    """DDD + últimos 8 dígitos: iguala formatos com/sem +55, zero e nono dígito."""
+    digitos = telefones.astype(str).str.replace(r"\D", "", regex=True)
+    digitos = digitos.str.replace(r"^(?:55)?0?(?=\d{10,11}$)", "", regex=True)
+    chave = digitos.str[:2] + digitos.str[-8:]
+    return chave.where(digitos.str.len().isin([10, 11]))
+
+
+def normalizar_placa(placas: pd.Series) -> pd.Series:
+    """Placa em maiúsculas sem separadores; vazia vira nulo."""
+    placa = placas.map(normaliza_placa)
+    return placa.where(placa.str.len() >= 7)
+
+
+def tokens_nome(nomes: pd.Series) -> list:
+    """Tokens do nome sem acento, em maiúsculas e sem preposições."""
+    return [
+        tuple(t for t in sem_acento(n).upper().split() if t not in STOPWORDS_NOME)
+        for n in nomes
+    ]
+
+
+def chave_cliente(df: pd.DataFrame) -> pd.Series:
+    """Identifica o cliente de cada venda para contagens de clientes distintos.
+
+    Usa o telefone normalizado; sem telefone válido, o nome sem acento e
+    sem preposições; sem nenhum dos dois, a própria venda. Vendas mescladas
+    na revisão de duplicados passam a ter a mesma chave.
+    """
+    telefone = normalizar_telefone(df['Telefone'])
+    nome = pd.Series([" ".join(t) for t in tokens_nome(df['Nome do Cliente'])], index=df.index)
+    chave = ("tel:" + telefone).fillna("nome:" + nome.where(nome != ""))
+    return chave.fillna(pd.Series("venda:" + df.index.astype(str), index=df.index))
+
+
+def _pares_candidatos(chaves: pd.DataFrame, max_bloco: int) -> tuple:
+    """Pares (a, b) de linhas que compartilham alguma chave de bloco.
+
+    Retorna também quantas chaves foram ignoradas por terem mais de
+    ``max_bloco`` linhas.
+    """
+    chaves = chaves.dropna(subset=["chave"]).drop_duplicates()
+    tamanho = chaves.groupby("chave")["id"].transform("size")
+    ignoradas = int(chaves.loc[tamanho > max_bloco, "chave"].nunique())
+    chaves = chaves[(tamanho > 1) & (tamanho <= max_bloco)]
+    pares = chaves.merge(chaves, on="chave", suffixes=("_a", "_b"))
+    pares = pares[pares["id_a"] < pares["id_b"]]
+    return pares[["id_a", "id_b"]].drop_duplicates().reset_index(drop=True), ignoradas
+
+
+def similaridade_nomes(pares_nomes: list) -> list:
+    """Similaridade (0-1) entre pares de nomes tokenizados.
+
+    Usa o maior entre o Jaccard dos tokens e a razão do difflib sobre os
+    nomes ordenados, para pegar tanto inversões quanto erros de digitação.
+    """
+    resultado = []
+    for a, b in pares_nomes:
+        if not a or not b:
+            resultado.append(0.0)
+            continue
+        sa, sb = set(a), set(b)
+        jaccard = len(sa & sb) / len(sa | sb)
+        razao = difflib.SequenceMatcher(None, " ".join(sorted(a)), " ".join(sorted(b))).ratio()
+        resultado.append(max(jaccard, razao))
+    return resultado
+
+
+def _agrupar(pares: pd.DataFrame) -> list:
+    """Une pares encadeados (A~B, B~C) no mesmo grupo (union-find)."""
+    pai = {}
+
+    def raiz(x):
+        while pai.setdefault(x, x) != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+
+    for a, b in zip(pares["id_a"], pares["id_b"]):
+        pai[raiz(a)] = raiz(b)
+    raizes = [raiz(a) for a in pares["id_a"]]
+    numeros = {r: i + 1 for i, r in enumerate(dict.fromkeys(raizes))}
+    return [numeros[r] for r in raizes]
+
+
+def detectar_duplicados(df: pd.DataFrame, limiar: float = LIMIAR, max_workers: int = None,
+                        max_bloco: int = MAX_BLOCO, tamanho_lote: int = TAMANHO_LOTE) -> tuple:
+    """Gera o relatório de possíveis clientes duplicados para revisão.
+
+    Em vez de comparar todas as linhas entre si (O(N²)), só compara linhas
+    que compartilham uma chave de bloco: telefone normalizado, placa ou
+    primeiro + último token do nome. Os pares candidatos são pontuados em
+    lotes, em paralelo quando há mais de um lote. Os índices A/B são os do
+    DataFrame recebido e só valem enquanto ele não for alterado.
+
+    Retorna ``(relatorio, chaves_ignoradas)``: o segundo valor conta as
+    chaves com mais de ``max_bloco`` vendas, que não foram comparadas.
+    """
+    colunas_relatorio = ['Grupo', 'Índice A', 'Índice B', 'Nome A', 'Nome B', 'Telefone A', 'Telefone B',
+                         'Placa A', 'Placa B', 'Pontuação', 'Motivos']
+    if len(df) < 2:
+        return pd.DataFrame(columns=colunas_relatorio), 0
+
+    telefone = normalizar_telefone(df['Telefone']).to_numpy(dtype=object)
+    placa = normalizar_placa(df['Placa']).to_numpy(dtype=object)
+    tokens = tokens_nome(df['Nome do Cliente'])
+    chave_nome = [f"{t[0]} {t[-1]}" if len(t) > 1 else None for t in tokens]
+
+    ids = np.arange(len(df))
+    chaves = pd.DataFrame({
+        "id": np.concatenate([ids, ids, ids]),
+        "chave": np.concatenate([
+            ["tel:" + t if isinstance(t, str) else None for t in telefone],
+            ["placa:" + p if isinstance(p, str) else None for p in placa],
+            ["nome:" + n if n else None for n in chave_nome],
+        ]),
+    })
+    pares, ignoradas = _pares_candidatos(chaves, max_bloco)
+    if pares.empty:
+        return pd.DataFrame(columns=colunas_relatorio), ignoradas
+
+    a = pares["id_a"].to_numpy()
+    b = pares["id_b"].to_numpy()
+    tel_igual = pd.notna(telefone[a]) & (telefone[a] == telefone[b])
+    placa_igual = pd.notna(placa[a]) & (placa[a] == placa[b])
+
+    pares_nomes = [(tokens[i], tokens[j]) for i, j in zip(a, b)]
+    lotes = [pares_nomes[i:i + tamanho_lote] for i in range(0, len(pares_nomes), tamanho_lote)]
+    if len(lotes) > 1 and pool_de_processos_disponivel():
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            sim_nome = np.concatenate([np.asarray(r) for r in pool.map(similaridade_nomes, lotes)])
+    else:
+        sim_nome = np.asarray(similaridade_nomes(pares_nomes))
+
+    pontuacao = PESOS["telefone"] * tel_igual + PESOS["placa"] * placa_igual + PESOS["nome"] * sim_nome
+    manter = pontuacao >= limiar
+    if not manter.any():
+        return pd.DataFrame(columns=colunas_relatorio), ignoradas
+
+    pares = pares[manter].reset_index(drop=True)
+    a, b = a[manter], b[manter]
+    motivos = [
+        ", ".join(m for m in (
+            "telefone" if t else "",
+            "placa" if p else "",
+            f"nome {s:.0%}" if s > 0 else "",
+        ) if m)
+        for t, p, s in zip(tel_igual[manter], placa_igual[manter], sim_nome[manter])
+    ]
+    relatorio = pd.DataFrame({
+        'Grupo': _agrupar(pares),
+        'Índice A': df.index[a],
+        'Índice B': df.index[b],
+        'Nome A': df['Nome do Cliente'].to_numpy()[a],
+        'Nome B': df['Nome do Cliente'].to_numpy()[b],
+        'Telefone A': df['Telefone'].to_numpy()[a],
+        'Telefone B': df['Telefone'].to_numpy()[b],
+        'Placa A': df['Placa'].to_numpy()[a],
+        'Placa B': df['Placa'].to_numpy()[b],
+        'Pontuação': pontuacao[manter].round(2),
+        'Motivos': motivos,
+    })
+    relatorio = relatorio.sort_values(['Grupo', 'Pontuação'], ascending=[True, False]).reset_index(drop=True)
+    return relatorio, ignoradas
@@ -0,0 +1,149 @@
+"""Consolidação de várias filiais: cada uma com seu diretório de dados."""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from ingestao import ler_em_blocos
+from paralelo import pool_de_processos_disponivel
+from particoes import MANIFESTO, ler_manifesto
+
+
+ARQUIVO_FILIAIS = "filiais.json"
+COLUNAS_RESUMO = ['Data', 'Valor Adesao', 'Valor Mensalidade', 'Status Adesao']
+KPIS = ["vendas", "valor_adesao", "valor_mensalidade", "adesoes_pagas", "valor_adesoes_pagas"]
+
+# Resumos por diretório de filial, reaproveitados enquanto a assinatura
+# (mtime/tamanho do arquivo de dados) não mudar.
+_cache_resumos = {}
+
+
+def ler_filiais(data_dir: Path) -> list:
+    """Lista as filiais registradas ({"nome", "caminho"})."""
+    caminho = Path(data_dir) / ARQUIVO_FILIAIS
+    if not caminho.exists():
+        return []
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_filiais(data_dir: Path, filiais: list):
+    """Grava o registro de filiais."""
+    with open(Path(data_dir) / ARQUIVO_FILIAIS, "w", encoding="utf-8") as f:
+        json.dump(filiais, f, indent=2, ensure_ascii=False)
+
+
+def _arquivo_dados(caminho: Path):
+    """Manifesto das partições, ou o vendas.csv antigo se a filial não migrou."""
+    for arquivo in (caminho / "vendas" / MANIFESTO, caminho / "vendas.csv"):
+        if arquivo.exists():
+            return arquivo
+    return None
+
+
+def assinatura_filial(caminho) -> tuple:
+    """Identifica a versão dos dados de uma filial sem lê-los."""
+    arquivo = _arquivo_dados(Path(caminho))
+    if arquivo is None:
+        return None
+    stat = os.stat(arquivo)
+    return (str(arquivo), stat.st_mtime_ns, stat.st_size)
+
+
+def resumir_filial(caminho) -> dict:
+    """Calcula os KPIs e o agregado mensal de uma filial.
+
+    Filiais particionadas são resumidas direto do manifesto; o vendas.csv
+    antigo é lido em blocos e agregado. Pode rodar nos processos do pool,
+    por isso só devolve tipos simples.
+    """
+    caminho = Path(caminho)
+    manifesto = ler_manifesto(caminho / "vendas")
+    if manifesto is not None:
+        mensal = {
+            chave: {
+                "vendas": info["linhas"],
+                "valor_adesao": info["valor_adesao"],
+                "valor_mensalidade": info["valor_mensalidade"],
+                "adesoes_pagas": info["adesoes_pagas"],
+                "valor_adesoes_pagas": info["valor_adesoes_pagas"],
+            }
+            for chave, info in manifesto["particoes"].items()
+        }
+    elif (caminho / "vendas.csv").exists():
+        # vendas.csv antigo: agregado bloco a bloco, sem carregar o arquivo inteiro
+        agregados = []
+        for bloco in ler_em_blocos(caminho / "vendas.csv", COLUNAS_RESUMO):
+            adesao = bloco['Valor Adesao'].fillna(0.0)
+            pagas = bloco['Status Adesao'] == 'Pago'
+            agregados.append(pd.DataFrame({
+                "mes": bloco['Data'].dt.strftime("%Y-%m").fillna("sem-data"),
+                "vendas": 1,
+                "valor_adesao": adesao,
+                "valor_mensalidade": bloco['Valor Mensalidade'].fillna(0.0),
+                "adesoes_pagas": pagas.astype(int),
+                "valor_adesoes_pagas": adesao.where(pagas, 0.0),
+            }).groupby("mes").sum())
+        agregado = pd.concat(agregados).groupby(level=0).sum() if agregados else pd.DataFrame(columns=KPIS)
+        mensal = {
+            mes: {k: (int(v) if k in ("vendas", "adesoes_pagas") else float(v)) for k, v in linha.items()}
+            for mes, linha in agregado.to_dict(orient="index").items()
+        }
+    else:
+        mensal = {}
+
+    kpis = {k: sum(m[k] for m in mensal.values()) for k in KPIS}
+    return {"kpis": kpis, "mensal": mensal}
+
+
+def consolidar(filiais: list, max_workers: int = None) -> dict:
+    """Resume todas as filiais e combina os agregados do grupo.
+
+    Só as filiais cujos dados mudaram desde a última chamada são
+    recalculadas; filiais ainda sem partições são lidas em paralelo.
+    Retorna os KPIs do grupo, uma tabela por filial e o agregado mensal de
+    vendas e receita (meses x filiais).
+    """
+    resumos = {}
+    pendentes = []
+    for filial in filiais:
+        assinatura = assinatura_filial(filial["caminho"])
+        em_cache = _cache_resumos.get(filial["caminho"])
+        if em_cache is not None and em_cache[0] == assinatura:
+            resumos[filial["nome"]] = em_cache[1]
+        else:
+            pendentes.append((filial, assinatura))
+
+    # Filiais particionadas só leem o manifesto: não compensa abrir processos.
+    # O pool fica para os vendas.csv antigos, que precisam ser lidos por completo.
+    legados = [p for p in pendentes if ler_manifesto(Path(p[0]["caminho"]) / "vendas") is None]
+    calculados = {}
+    if len(legados) > 1 and pool_de_processos_disponivel():
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            caminhos = [f["caminho"] for f, _ in legados]
+            calculados = dict(zip(caminhos, pool.map(resumir_filial, caminhos)))
+
+    for filial, assinatura in pendentes:
+        resumo = calculados.get(filial["caminho"]) or resumir_filial(filial["caminho"])
+        _cache_resumos[filial["caminho"]] = (assinatura, resumo)
+        resumos[filial["nome"]] = resumo
+
+    por_filial = pd.DataFrame(
+        {nome: r["kpis"] for nome, r in resumos.items()}, index=KPIS
+    ).T.reindex(columns=KPIS).fillna(0)
+    grupo = {k: (por_filial[k].sum() if not por_filial.empty else 0) for k in KPIS}
+
+    def _mensal(kpi):
+        return pd.DataFrame({
+            nome: {mes: m[kpi] for mes, m in r["mensal"].items() if mes != "sem-data"}
+            for nome, r in resumos.items()
+        }).sort_index().fillna(0)
+
+    return {
+        "grupo": grupo,
+        "por_filial": por_filial,
+        "vendas_mes": _mensal("vendas"),
+        "receita_mes": _mensal("valor_adesao"),
+    }
@@ -0,0 +1,188 @@
+"""Leitura de CSVs de vendas: detecção de encoding, cabeçalhos e tipos explícitos."""
+import codecs
+import difflib
+import re
+import unicodedata
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+
+COLUNAS_NUMERICAS = ['Valor Adesao', 'Valor Mensalidade']
+TAMANHO_BLOCO = 200_000
+TAMANHO_AMOSTRA = 1024 * 1024
+
+
+def _amostra_decisiva(caminho) -> bytes:
+    """Primeiro trecho do arquivo com bytes não ASCII (ou o início, se não houver).
+
+    Um prefixo só ASCII não diz nada sobre o encoding: arquivos antigos
+    costumam ter o cabeçalho e milhares de linhas sem acento antes do
+    primeiro "João". A leitura continua até esse byte aparecer.
+    """
+    with open(caminho, "rb") as f:
+        inicio = trecho = f.read(TAMANHO_AMOSTRA)
+        while trecho:
+            if not trecho.isascii():
+                return trecho
+            trecho = f.read(TAMANHO_AMOSTRA)
+    return inicio
+
+
+def detectar_encoding(caminho) -> str:
+    """Identifica o encoding do arquivo: UTF-8 (com ou sem BOM), cp1252 ou latin-1."""
+    with open(caminho, "rb") as f:
+        if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8:
+            return "utf-8-sig"
+    amostra = _amostra_decisiva(caminho)
+    try:
+        # final=False tolera um caractere multibyte cortado no fim da amostra
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Bytes 0x80-0x9F são controle em latin-1 mas caracteres (€, “, ”) em cp1252
+    if re.search(rb"[\x80-\x9f]", amostra):
+        try:
+            amostra.decode("cp1252")
+            return "cp1252"
+        except UnicodeDecodeError:
+            pass
+    return "latin-1"
+
+
+def sem_acento(texto) -> str:
+    """Remove acentos e demais caracteres fora do ASCII ("João" -> "Joao")."""
+    return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+
+
+def normaliza_placa(placa) -> str:
+    """Remove caracteres especiais da placa."""
+    return re.sub(r'[^A-Z0-9]', '', str(placa).upper())
+
+
+def _chave(nome: str) -> str:
+    """Forma canônica de um cabeçalho: sem acentos, minúsculo, só letras e dígitos."""
+    return re.sub(r"[^a-z0-9]", "", sem_acento(nome).lower())
+
+
+def mapear_colunas(cabecalho, colunas) -> dict:
+    """Mapeia os cabeçalhos do arquivo para os nomes padrão em ``colunas``.
+
+    Aceita variações de acento, caixa e espaçamento e cabeçalhos corrompidos
+    por encoding errado (ex.: "Modelo do Ve�culo"). Cabeçalhos sem
+    correspondência ficam de fora.
+    """
+    padrao = {_chave(c): c for c in colunas}
+    mapa = {}
+    usadas = set()
+    for original in cabecalho:
+        chave = _chave(original)
+        destino = padrao.get(chave)
+        if destino is None:
+            parecida = difflib.get_close_matches(chave, list(padrao), n=1, cutoff=0.85)
+            destino = padrao[parecida[0]] if parecida else None
+        if destino is not None and destino not in usadas:
+            mapa[original] = destino
+            usadas.add(destino)
+    return mapa
+
+
+def _para_numero(valores: pd.Series) -> pd.Series:
+    """Converte texto em float, aceitando o formato brasileiro (1.234,56)."""
+    if pd.api.types.is_numeric_dtype(valores):
+        return valores.astype("float64")
+    texto = valores.astype("object").where(valores.notna(), None)
+    brasileiro = texto.str.contains(",", regex=False, na=False)
+    texto = texto.where(~brasileiro, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors='coerce').astype("float64")
+
+
+def _converter_tipos(df: pd.DataFrame, colunas) -> pd.DataFrame:
+    # Sempre nas colunas e ordem padrão; colunas ausentes no arquivo ficam nulas
+    df = df.reindex(columns=colunas)
+    if 'Data' in df.columns:
+        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    for col in COLUNAS_NUMERICAS:
+        if col in df.columns:
+            df[col] = _para_numero(df[col])
+    return df
+
+
+def padronizar_vendas(df: pd.DataFrame, colunas) -> pd.DataFrame:
+    """Garante as colunas padrão e converte os tipos das vendas carregadas.
+
+    Data vira datetime, valores viram float e o restante vira texto, com
+    campos vazios como "" (e não "nan").
+    """
+    df = _converter_tipos(df, colunas)
+    for col in colunas:
+        if col != 'Data' and col not in COLUNAS_NUMERICAS:
+            df[col] = df[col].fillna("").astype(str)
+    return df
+
+
+def _preparar_leitura(caminho, colunas):
+    encoding = detectar_encoding(caminho)
+    cabecalho = pd.read_csv(caminho, encoding=encoding, nrows=0).columns
+    mapa = mapear_colunas(cabecalho, colunas)
+    return encoding, mapa
+
+
+def _opcoes_pyarrow(encoding, mapa, **leitura):
+    # Tudo é lido como texto (telefone e placa mantêm zeros à esquerda);
+    # datas e valores são convertidos depois, com erros virando NaN/NaT
+    return {
+        "read_options": pa_csv.ReadOptions(encoding=encoding, use_threads=True, **leitura),
+        "convert_options": pa_csv.ConvertOptions(
+            include_columns=list(mapa),
+            column_types={c: pa.string() for c in mapa},
+            strings_can_be_null=True,
+        ),
+    }
+
+
+def ler_em_blocos(caminho, colunas, tamanho_bloco: int = TAMANHO_BLOCO):
+    """Lê o CSV em blocos de cerca de ``tamanho_bloco`` linhas, já mapeados e tipados.
+
+    Com pyarrow, usa o leitor em streaming (``open_csv``): o arquivo nunca é
+    carregado inteiro, só um bloco por vez. Sem pyarrow, usa o parser C do
+    pandas com ``chunksize``.
+    """
+    encoding, mapa = _preparar_leitura(caminho, colunas)
+    if pa is None:
+        leitor = pd.read_csv(caminho, encoding=encoding, usecols=list(mapa),
+                             dtype={c: str for c in mapa}, chunksize=tamanho_bloco)
+        for bloco in leitor:
+            yield _converter_tipos(bloco.rename(columns=mapa), colunas)
+        return
+
+    leitor = pa_csv.open_csv(str(caminho), **_opcoes_pyarrow(encoding, mapa))
+    pendentes, linhas = [], 0
+    for lote in leitor:
+        pendentes.append(lote)
+        linhas += lote.num_rows
+        if linhas >= tamanho_bloco:
+            yield _converter_tipos(pa.Table.from_batches(pendentes).to_pandas().rename(columns=mapa), colunas)
+            pendentes, linhas = [], 0
+    if linhas:
+        yield _converter_tipos(pa.Table.from_batches(pendentes).to_pandas().rename(columns=mapa), colunas)
+
+
+def ler_vendas(caminho, colunas) -> pd.DataFrame:
+    """Lê um CSV de vendas inteiro, com encoding detectado e colunas padronizadas.
+
+    Usa o leitor multithread do pyarrow quando disponível. Para arquivos
+    grandes que não precisam ficar inteiros em memória, use ``ler_em_blocos``.
+    """
+    encoding, mapa = _preparar_leitura(caminho, colunas)
+    if pa is None:
+        df = pd.read_csv(caminho, encoding=encoding, usecols=list(mapa), dtype={c: str for c in mapa})
+    else:
+        df = pa_csv.read_csv(str(caminho), **_opcoes_pyarrow(encoding, mapa)).to_pandas()
+    return _converter_tipos(df.rename(columns=mapa), colunas)
@@ -0,0 +1,12 @@
+"""Decide quando o trabalho pesado pode ir para um pool de processos."""
+import sys
+
+
+def pool_de_processos_disponivel() -> bool:
+    """Indica se é seguro abrir um ``ProcessPoolExecutor``.
+
+    No executável (PyInstaller) não há ``freeze_support()`` no ponto de
+    entrada, então cada processo filho relançaria o app; lá o trabalho
+    roda em série.
+    """
+    return not getattr(sys, "frozen", False)
@@ -0,0 +1,194 @@
+"""Armazenamento de vendas particionado por mês (vendas/AAAA-MM.csv + manifesto)."""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+MANIFESTO = "manifesto.json"
+SEM_DATA = "sem-data"
+# Formato novo, sem leitor legado: UTF-8 guarda qualquer caractere (’, €, emoji)
+ENCODING = "utf-8"
+
+# Partições de meses fechados quase nunca mudam: ficam em memória, uma
+# entrada por arquivo, substituída quando o hash do manifesto muda.
+_cache_fechadas = {}
+
+
+def chave_particao(data) -> str:
+    """Retorna a chave da partição (AAAA-MM) de uma data."""
+    data = pd.to_datetime(data, errors='coerce')
+    if pd.isna(data):
+        return SEM_DATA
+    return f"{data.year:04d}-{data.month:02d}"
+
+
+def particao_fechada(chave: str, agora: datetime = None) -> bool:
+    """Um mês é fechado quando já terminou; a partição sem data nunca fecha."""
+    if chave == SEM_DATA:
+        return False
+    return chave < chave_particao(agora or datetime.now())
+
+
+def ler_manifesto(base_dir: Path):
+    """Lê o manifesto das partições; retorna None se ainda não existir."""
+    caminho = Path(base_dir) / MANIFESTO
+    if not caminho.exists():
+        return None
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _gravar_atomico(caminho: Path, conteudo: bytes):
+    tmp = caminho.with_suffix(caminho.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(conteudo)
+    os.replace(tmp, caminho)
+
+
+def _resumo(chave: str, parte: pd.DataFrame, conteudo: bytes) -> dict:
+    """Contagem e agregados gravados no manifesto para cada partição."""
+    datas = pd.to_datetime(parte['Data'], errors='coerce')
+    adesao = pd.to_numeric(parte['Valor Adesao'], errors='coerce')
+    mensalidade = pd.to_numeric(parte['Valor Mensalidade'], errors='coerce')
+    pagas = parte['Status Adesao'] == 'Pago'
+    return {
+        "linhas": int(len(parte)),
+        "inicio": datas.min().strftime("%Y-%m-%d") if datas.notna().any() else None,
+        "fim": datas.max().strftime("%Y-%m-%d") if datas.notna().any() else None,
+        "valor_adesao": float(adesao.sum()),
+        "valor_mensalidade": float(mensalidade.sum()),
+        "adesoes_pagas": int(pagas.sum()),
+        "valor_adesoes_pagas": float(adesao[pagas].sum()),
+        "hash": hashlib.sha1(conteudo).hexdigest(),
+        "arquivo": f"{chave}.csv",
+    }
+
+
+def _gravar_manifesto(base_dir: Path, manifesto: dict):
+    manifesto["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+    _gravar_atomico(Path(base_dir) / MANIFESTO, json.dumps(manifesto, indent=2).encode("utf-8"))
+
+
+def _chaves(df: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(df['Data'], errors='coerce').dt.strftime("%Y-%m").fillna(SEM_DATA)
+
+
+def salvar_particoes(df: pd.DataFrame, base_dir: Path, backup=None) -> list:
+    """Grava o DataFrame em partições mensais, reescrevendo só os meses alterados.
+
+    O conteúdo de cada mês é comparado com o hash do manifesto; partições
+    iguais (em especial as de meses fechados) não são tocadas. ``backup``
+    recebe o caminho de cada arquivo antes de ser sobrescrito ou removido.
+    Retorna as chaves das partições reescritas.
+    """
+    base_dir = Path(base_dir)
+    base_dir.mkdir(parents=True, exist_ok=True)
+    manifesto = ler_manifesto(base_dir) or {"versao": 1, "particoes": {}}
+    antigas = manifesto["particoes"]
+
+    novas = {}
+    alteradas = []
+    for chave, parte in df.groupby(_chaves(df), sort=True):
+        conteudo = parte.to_csv(index=False).encode(ENCODING)
+        resumo = _resumo(chave, parte, conteudo)
+        novas[chave] = resumo
+        if antigas.get(chave, {}).get("hash") == resumo["hash"]:
+            continue
+        caminho = base_dir / resumo["arquivo"]
+        if backup is not None and caminho.exists():
+            backup(str(caminho))
+        _gravar_atomico(caminho, conteudo)
+        alteradas.append(chave)
+
+    for chave in set(antigas) - set(novas):
+        caminho = base_dir / antigas[chave]["arquivo"]
+        if caminho.exists():
+            if backup is not None:
+                backup(str(caminho))
+            caminho.unlink()
+        alteradas.append(chave)
+
+    manifesto["particoes"] = novas
+    _gravar_manifesto(base_dir, manifesto)
+    return sorted(alteradas)
+
+
+def migrar_blocos(blocos, base_dir: Path) -> list:
+    """Monta as partições a partir de blocos de um CSV grande.
+
+    Cada bloco é distribuído por mês e anexado a um arquivo temporário;
+    depois cada partição é finalizada isoladamente. A migração em si usa no
+    máximo um bloco ou um mês em memória, nunca o arquivo inteiro.
+    """
+    base_dir = Path(base_dir)
+    base_dir.mkdir(parents=True, exist_ok=True)
+    # Sobras de uma migração interrompida (o manifesto só é gravado no fim)
+    for sobra in base_dir.glob("*.csv.migrando"):
+        sobra.unlink()
+
+    temporarios = {}
+    for bloco in blocos:
+        for chave, parte in bloco.groupby(_chaves(bloco), sort=False):
+            tmp = base_dir / f"{chave}.csv.migrando"
+            primeiro = chave not in temporarios
+            parte.to_csv(tmp, mode="w" if primeiro else "a", header=primeiro, index=False,
+                         encoding=ENCODING)
+            temporarios[chave] = tmp
+
+    particoes = {}
+    for chave, tmp in sorted(temporarios.items()):
+        parte = pd.read_csv(tmp, encoding=ENCODING, dtype=str)
+        conteudo = parte.to_csv(index=False).encode(ENCODING)
+        particoes[chave] = _resumo(chave, parte, conteudo)
+        _gravar_atomico(base_dir / particoes[chave]["arquivo"], conteudo)
+        tmp.unlink()
+
+    _gravar_manifesto(base_dir, {"versao": 1, "particoes": particoes})
+    return sorted(particoes)
+
+
+def particoes_no_periodo(manifesto: dict, inicio=None, fim=None) -> list:
+    """Chaves das partições que se sobrepõem ao período [inicio, fim]."""
+    chaves = sorted(manifesto["particoes"])
+    if inicio is None and fim is None:
+        return chaves
+    ini = chave_particao(inicio) if inicio is not None else None
+    fim_ = chave_particao(fim) if fim is not None else None
+    return [
+        c for c in chaves
+        if c != SEM_DATA and (ini is None or c >= ini) and (fim_ is None or c <= fim_)
+    ]
+
+
+def _ler_particao(base_dir: Path, chave: str, info: dict) -> pd.DataFrame:
+    caminho = Path(base_dir) / info["arquivo"]
+    em_cache = _cache_fechadas.get(str(caminho))
+    if particao_fechada(chave) and em_cache is not None and em_cache[0] == info["hash"]:
+        return em_cache[1]
+    # Tudo como texto: telefone e placa não perdem zeros à esquerda
+    parte = pd.read_csv(str(caminho), encoding=ENCODING, dtype=str)
+    if particao_fechada(chave):
+        _cache_fechadas[str(caminho)] = (info["hash"], parte)
+    return parte
+
+
+def carregar_particoes(base_dir: Path, inicio=None, fim=None, colunas=None) -> pd.DataFrame:
+    """Carrega apenas as partições que cobrem o período pedido.
+
+    Sem período, carrega todas (inclusive vendas sem data). Retorna o
+    conteúdo bruto dos CSVs; a conversão de tipos fica a cargo de quem chama.
+    """
+    manifesto = ler_manifesto(base_dir)
+    if manifesto is None:
+        return pd.DataFrame(columns=colunas)
+    partes = [
+        _ler_particao(base_dir, chave, manifesto["particoes"][chave])
+        for chave in particoes_no_periodo(manifesto, inicio, fim)
+    ]
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório, ao lado de dashboard.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ingestao  # noqa: E402
+
+
+@pytest.fixture(params=["pyarrow", "pandas"])
+def leitor(request, monkeypatch):
+    """Roda o teste com o leitor pyarrow e com o fallback do pandas."""
+    if request.param == "pandas":
+        monkeypatch.setattr(ingestao, "pa", None)
+    elif ingestao.pa is None:
+        pytest.skip("pyarrow não instalado")
+    return request.param
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from duplicados import (_agrupar, chave_cliente, detectar_duplicados, normalizar_placa,
+                        normalizar_telefone, tokens_nome)
+
+
+def _vendas(nomes, telefones, placas):
+    return pd.DataFrame({'Nome do Cliente': nomes, 'Telefone': telefones, 'Placa': placas})
+
+
+@pytest.mark.parametrize("telefone", [
+    "(11) 98765-4321",
+    "+55 11 98765-4321",
+    "011 98765-4321",
+    "5511987654321",
+    "(11) 8765-4321",
+])
+def test_telefone_iguala_formatos(telefone):
+    assert normalizar_telefone(pd.Series([telefone]))[0] == "1187654321"
+
+
+def test_telefone_invalido_vira_nulo():
+    assert normalizar_telefone(pd.Series(["", "12345", "nan"])).isna().all()
+
+
+def test_placa_normalizada():
+    placas = normalizar_placa(pd.Series(["abc-1234", "ABC1D23", "", None]))
+    assert placas[:2].tolist() == ["ABC1234", "ABC1D23"]
+    assert placas[2:].isna().all()
+
+
+def test_tokens_nome_sem_acento_e_preposicoes():
+    assert tokens_nome(["José da Silva", "Nan Souza"]) == [("JOSE", "SILVA"), ("NAN", "SOUZA")]
+
+
+def test_agrupar_une_pares_encadeados():
+    pares = pd.DataFrame({"id_a": [0, 1, 5], "id_b": [1, 2, 6]})
+    assert _agrupar(pares) == [1, 1, 2]
+
+
+def test_detecta_mesmo_cliente_em_formatos_diferentes():
+    df = _vendas(
+        ["João da Silva", "Joao Silva", "Maria Souza"],
+        ["(11) 98765-4321", "+55 11 8765-4321", "(21) 99999-0000"],
+        ["ABC-1234", "abc1234", "XYZ9876"],
+    )
+    relatorio, ignoradas = detectar_duplicados(df)
+    assert ignoradas == 0
+    assert relatorio[['Índice A', 'Índice B']].values.tolist() == [[0, 1]]
+    assert relatorio.loc[0, 'Motivos'].startswith("telefone, placa")
+
+
+def test_conta_chaves_ignoradas():
+    df = _vendas(["Cliente"] * 4, ["(11) 98765-4321"] * 4, ["", "", "", ""])
+    relatorio, ignoradas = detectar_duplicados(df, max_bloco=3)
+    assert relatorio.empty
+    assert ignoradas == 1
+
+
+def test_chave_cliente_conta_clientes_distintos():
+    df = _vendas(
+        ["João Silva", "Joao da Silva", "Maria", "", ""],
+        ["11 98765-4321", "+55 11 98765-4321", "", "", ""],
+        [""] * 5,
+    )
+    chaves = chave_cliente(df)
+    assert chaves.nunique() == 4
+    assert chaves[0] == chaves[1]
+    assert chaves[2] == "nome:MARIA"
+    assert chaves[3] != chaves[4]
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+import filiais
+from filiais import consolidar, ler_filiais, resumir_filial, salvar_filiais
+from particoes import salvar_particoes
+
+
+VENDAS = pd.DataFrame({
+    'Data': ['2025-09-01', '2025-10-23', '2025-10-24'],
+    'Nome do Cliente': ['A', 'B', 'C'],
+    'Valor Adesao': [100.0, 200.0, 300.0],
+    'Valor Mensalidade': [10.0, 20.0, 30.0],
+    'Status Adesao': ['Pago', 'Pendente', 'Pago'],
+})
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo(monkeypatch):
+    monkeypatch.setattr(filiais, "_cache_resumos", {})
+
+
+@pytest.fixture
+def particionada(tmp_path):
+    caminho = tmp_path / "particionada"
+    salvar_particoes(VENDAS, caminho / "vendas")
+    return caminho
+
+
+@pytest.fixture
+def legada(tmp_path):
+    caminho = tmp_path / "legada"
+    caminho.mkdir()
+    VENDAS.to_csv(caminho / "vendas.csv", index=False, encoding="latin-1")
+    return caminho
+
+
+def test_resumo_igual_para_filial_legada_e_particionada(particionada, legada):
+    assert resumir_filial(particionada) == resumir_filial(legada)
+    kpis = resumir_filial(legada)["kpis"]
+    assert kpis == {"vendas": 3, "valor_adesao": 600.0, "valor_mensalidade": 60.0,
+                    "adesoes_pagas": 2, "valor_adesoes_pagas": 400.0}
+
+
+def test_consolidar_soma_filiais_e_ignora_diretorio_vazio(particionada, legada, tmp_path):
+    vazia = tmp_path / "vazia"
+    vazia.mkdir()
+    resultado = consolidar([
+        {"nome": "Matriz", "caminho": str(particionada)},
+        {"nome": "Antiga", "caminho": str(legada)},
+        {"nome": "Vazia", "caminho": str(vazia)},
+    ])
+
+    assert resultado["grupo"]["vendas"] == 6
+    assert resultado["grupo"]["valor_adesoes_pagas"] == 800.0
+    assert resultado["por_filial"].loc["Vazia", "vendas"] == 0
+    assert resultado["vendas_mes"].loc["2025-10"].tolist() == [2, 2, 0]
+    assert resultado["receita_mes"].loc["2025-09", "Antiga"] == 100.0
+
+
+def test_consolidar_reaproveita_filial_sem_alteracao(particionada, monkeypatch):
+    filial = [{"nome": "Matriz", "caminho": str(particionada)}]
+    consolidar(filial)
+
+    chamadas = []
+    monkeypatch.setattr(filiais, "resumir_filial", lambda c: chamadas.append(c))
+    assert consolidar(filial)["grupo"]["vendas"] == 3
+    assert chamadas == []
+
+
+def test_registro_de_filiais(tmp_path):
+    assert ler_filiais(tmp_path) == []
+    salvar_filiais(tmp_path, [{"nome": "São Paulo", "caminho": "/dados/sp"}])
+    assert ler_filiais(tmp_path) == [{"nome": "São Paulo", "caminho": "/dados/sp"}]
@@ -0,0 +1,53 @@
+import codecs
+
+from ingestao import TAMANHO_AMOSTRA, detectar_encoding, ler_em_blocos, ler_vendas, mapear_colunas
+
+
+COLUNAS = ['Data', 'Nome do Cliente', 'Telefone', 'Modelo do Veículo', 'Valor Adesao']
+
+
+def test_prefixo_ascii_longo_nao_decide_por_utf8(leitor, tmp_path):
+    arquivo = tmp_path / "vendas.csv"
+    linha = b"2025-10-01,Cliente Sem Acento,11999990000,GOL,100.0\n"
+    prefixo = linha * (2 * TAMANHO_AMOSTRA // len(linha))
+    arquivo.write_bytes(
+        b"Data,Nome do Cliente,Telefone,Modelo do Veiculo,Valor Adesao\n" + prefixo
+        + "2025-10-02,João,11988887777,UNO,200.0\n".encode("latin-1")
+    )
+
+    assert detectar_encoding(arquivo) == "latin-1"
+    ultimo = list(ler_em_blocos(arquivo, COLUNAS))[-1]
+    assert ultimo['Nome do Cliente'].iloc[-1] == "João"
+
+
+def test_detecta_bom_utf8_e_cp1252(tmp_path):
+    casos = {
+        "bom.csv": codecs.BOM_UTF8 + "Nome do Cliente\nJoão\n".encode("utf-8"),
+        "utf8.csv": "Nome do Cliente\nJoão\n".encode("utf-8"),
+        "cp1252.csv": "Nome do Cliente\n“João” €\n".encode("cp1252"),
+        "ascii.csv": b"Nome do Cliente\nJoao\n",
+    }
+    esperado = {"bom.csv": "utf-8-sig", "utf8.csv": "utf-8", "cp1252.csv": "cp1252", "ascii.csv": "utf-8"}
+    for nome, conteudo in casos.items():
+        (tmp_path / nome).write_bytes(conteudo)
+        assert detectar_encoding(tmp_path / nome) == esperado[nome], nome
+
+
+def test_mapeia_variacoes_de_cabecalho():
+    cabecalho = ['DATA', 'nome do cliente', 'Modelo do Ve�culo', 'Valor Adesão', 'Extra']
+    assert mapear_colunas(cabecalho, COLUNAS) == {
+        'DATA': 'Data',
+        'nome do cliente': 'Nome do Cliente',
+        'Modelo do Ve�culo': 'Modelo do Veículo',
+        'Valor Adesão': 'Valor Adesao',
+    }
+
+
+def test_ler_vendas_mantem_zeros_e_aceita_decimal_brasileiro(leitor, tmp_path):
+    arquivo = tmp_path / "vendas.csv"
+    arquivo.write_text('Data,Telefone,Valor Adesao\n2025-10-01,011999,"1.234,56"\n', encoding="utf-8")
+
+    df = ler_vendas(arquivo, COLUNAS)
+    assert list(df.columns) == COLUNAS
+    assert df['Telefone'].item() == '011999'
+    assert df['Valor Adesao'].item() == 1234.56
@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from mensalidades import mensalidades_pendentes, projetar_mensalidades
+
+
+def _contratos(datas, valores, status=None):
+    return pd.DataFrame({
+        'Data': pd.to_datetime(datas),
+        'Valor Mensalidade': valores,
+        'Status Mensalidade': status or [''] * len(valores),
+    })
+
+
+def test_contrato_antigo_ja_entra_descontado_pelo_churn():
+    df = _contratos(['2024-10-15'], [100.0])
+    projecao = projetar_mensalidades(df, horizonte=3, churn_mensal=0.1, inicio='2026-10-01')
+
+    # 24 meses desde a venda
+    assert projecao['Receita Projetada'].iloc[0] == pytest.approx(100.0 * 0.9 ** 24)
+    assert projecao['Receita Projetada'].iloc[2] == pytest.approx(100.0 * 0.9 ** 26)
+    assert projecao['Contratos Ativos'].iloc[0] == pytest.approx(0.9 ** 24)
+    assert projecao['MRR Contratado'].tolist() == [100.0, 100.0, 100.0]
+
+
+def test_contrato_sem_data_conta_como_vendido_no_mes_inicial():
+    df = _contratos([None], [100.0])
+    projecao = projetar_mensalidades(df, horizonte=2, churn_mensal=0.5, inicio='2026-10-01')
+
+    assert projecao['Receita Projetada'].tolist() == [100.0, 50.0]
+
+
+def test_contrato_futuro_entra_no_mes_da_venda():
+    df = _contratos(['2026-12-05', '2030-01-01'], [60.0, 999.0])
+    projecao = projetar_mensalidades(df, horizonte=4, churn_mensal=0.0, inicio='2026-10-19')
+
+    assert list(projecao.index.strftime('%Y-%m')) == ['2026-10', '2026-11', '2026-12', '2027-01']
+    assert projecao['MRR Contratado'].tolist() == [0.0, 0.0, 60.0, 60.0]
+    assert projecao['Receita Acumulada'].iloc[-1] == 120.0
+
+
+def test_mensalidade_zero_ou_invalida_fica_de_fora():
+    df = _contratos(['2026-10-01'] * 3, [0.0, None, 80.0])
+    projecao = projetar_mensalidades(df, horizonte=1, inicio='2026-10-01')
+
+    assert projecao['Contratos Ativos'].iloc[0] == 1.0
+    assert projecao['MRR Contratado'].iloc[0] == 80.0
+
+
+def test_mensalidades_pendentes():
+    df = _contratos(['2026-10-01'] * 3, [10.0, 20.0, 30.0], ['Pendente', 'Pago', 'Pendente'])
+    assert mensalidades_pendentes(df) == 40.0
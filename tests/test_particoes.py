@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+import ingestao
+from ingestao import ler_em_blocos, padronizar_vendas
+import particoes
+from particoes import carregar_particoes, ler_manifesto, migrar_blocos, particoes_no_periodo, salvar_particoes
+
+
+COLUNAS = ['Data', 'Nome do Cliente', 'Telefone', 'Veiculo', 'Modelo do Veículo', 'Placa', 'Plano',
+           'Valor Adesao', 'Valor Mensalidade', 'Status Adesao', 'Status Mensalidade']
+
+LEGADO = (
+    "Data,Nome do Cliente,Telefone,Veiculo,Modelo do Ve\xedculo,Placa,Plano,"
+    "Valor Adesao,Valor Mensalidade,Status Adesao,Status Mensalidade\r\n"
+    "2025-09-10,Jo\xe3o da Silva,011988887777,GOL,G5,ABC1234,GOLD,500.0,150.0,Pago,\r\n"
+    "2025-10-23,Thiago Galdiano,35991437760,AUDI A3,A3,DRT6G66,BLACK,500.0,197.0,Pago,Pendente\r\n"
+    "2025-10-24,Maria Souza,21999990000,,,QWE1A23,PLATINUM,,120.0,Pendente,\r\n"
+    ",Sem Data,21999990001,FIAT,UNO,XYZ9876,GOLD,300.0,100.0,Pendente,\r\n"
+)
+
+
+@pytest.fixture
+def legado(tmp_path):
+    arquivo = tmp_path / "vendas.csv"
+    arquivo.write_bytes(LEGADO.encode("latin-1"))
+    return arquivo
+
+
+def test_migrar_carregar_salvar_nao_reescreve(leitor, legado, tmp_path):
+    base = tmp_path / "vendas"
+    migradas = migrar_blocos(ler_em_blocos(legado, COLUNAS, tamanho_bloco=1), base)
+    assert migradas == ["2025-09", "2025-10", "sem-data"]
+
+    df = padronizar_vendas(carregar_particoes(base, colunas=COLUNAS), COLUNAS)
+    assert len(df) == 4
+    assert df.loc[df['Nome do Cliente'] == 'João da Silva', 'Telefone'].item() == '011988887777'
+    assert df['Modelo do Veículo'].tolist()[:2] == ['G5', 'A3']
+
+    assert salvar_particoes(df, base) == []
+
+
+def test_migrar_ignora_temporario_de_migracao_interrompida(leitor, legado, tmp_path):
+    base = tmp_path / "vendas"
+    base.mkdir()
+    (base / "2025-10.csv.migrando").write_text(
+        "Data,Nome do Cliente\n2025-10-23,Thiago Galdiano\n", encoding="latin-1"
+    )
+
+    migrar_blocos(ler_em_blocos(legado, COLUNAS), base)
+
+    df = carregar_particoes(base, colunas=COLUNAS)
+    assert len(df) == 4
+    assert "Nome do Cliente" not in df['Nome do Cliente'].tolist()
+    assert ler_manifesto(base)["particoes"]["2025-10"]["linhas"] == 2
+    assert not list(base.glob("*.migrando"))
+
+
+def test_padronizar_vendas_aceita_dados_ja_tipados(leitor, legado):
+    df = ingestao.ler_vendas(legado, COLUNAS)
+    duas_vezes = padronizar_vendas(padronizar_vendas(df, COLUNAS), COLUNAS)
+    assert duas_vezes['Valor Adesao'].tolist()[:2] == [500.0, 500.0]
+    assert duas_vezes['Veiculo'].tolist()[2] == ''
+
+
+def _vendas(datas, nomes):
+    return padronizar_vendas(pd.DataFrame({
+        'Data': datas, 'Nome do Cliente': nomes, 'Valor Adesao': 100.0,
+        'Valor Mensalidade': 50.0, 'Status Adesao': 'Pago',
+    }), COLUNAS)
+
+
+def test_salvar_preserva_caracteres_fora_do_latin1(tmp_path):
+    base = tmp_path / "vendas"
+    salvar_particoes(_vendas(['2025-10-01', '2025-10-02'], ['Zoë 😀', 'Ana D’Ávila €']), base)
+
+    df = carregar_particoes(base, colunas=COLUNAS)
+    assert df['Nome do Cliente'].tolist() == ['Zoë 😀', 'Ana D’Ávila €']
+
+
+def test_carregar_periodo_le_so_particoes_sobrepostas(tmp_path):
+    base = tmp_path / "vendas"
+    salvar_particoes(_vendas(['2025-08-15', '2025-09-15', '2025-10-15', None], ['A', 'B', 'C', 'D']), base)
+
+    assert particoes_no_periodo(ler_manifesto(base), '2025-09-01', '2025-10-31') == ['2025-09', '2025-10']
+    assert particoes_no_periodo(ler_manifesto(base), inicio='2025-10-01') == ['2025-10']
+    df = carregar_particoes(base, '2025-09-20', '2025-10-01', colunas=COLUNAS)
+    assert df['Nome do Cliente'].tolist() == ['B', 'C']
+    assert len(carregar_particoes(base, colunas=COLUNAS)) == 4
+
+
+def test_cache_de_mes_fechado_e_substituido_ao_editar(tmp_path, monkeypatch):
+    monkeypatch.setattr(particoes, "_cache_fechadas", {})
+    base = tmp_path / "vendas"
+    df = _vendas(['2020-01-10', '2020-02-10'], ['A', 'B'])
+    salvar_particoes(df, base)
+    carregar_particoes(base, colunas=COLUNAS)
+
+    df.loc[0, 'Nome do Cliente'] = 'A editado'
+    assert salvar_particoes(df, base) == ['2020-01']
+
+    assert carregar_particoes(base, colunas=COLUNAS)['Nome do Cliente'].tolist() == ['A editado', 'B']
+    assert len(particoes._cache_fechadas) == 2